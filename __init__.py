@@ -16,7 +16,8 @@ PLATFORMS: list[Platform] = [Platform.CLIMATE]
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Ballu ASP-100 from a config entry."""
-    hass.data.setdefault(DOMAIN, {})
+    if DOMAIN not in hass.data:
+        hass.data[DOMAIN] = {}
     
     # Create MQTT client
     mqtt_client = BalluMQTTClient(hass, entry.data)
@@ -48,11 +49,18 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     
     return True
 
+def _get_entry_data(hass: HomeAssistant, entry: ConfigEntry) -> dict | None:
+    """Return stored data for a config entry, if any."""
+    domain_data = hass.data.get(DOMAIN)
+    if domain_data is None:
+        return None
+    return domain_data.get(entry.entry_id)
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     # Disconnect MQTT client
-    if entry.entry_id in hass.data.get(DOMAIN, {}):
-        mqtt_client = hass.data[DOMAIN][entry.entry_id].get("mqtt_client")
+    if entry_data := _get_entry_data(hass, entry):
+        mqtt_client = entry_data.get("mqtt_client")
         if mqtt_client:
             await mqtt_client.disconnect()
     
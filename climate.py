@@ -1,7 +1,9 @@
 """Climate platform for Ballu ASP-100 Breezer."""
 from __future__ import annotations
 
+import asyncio
 import logging
+from functools import lru_cache
 from typing import Any
 
 from homeassistant.components.climate import (
@@ -28,6 +30,47 @@ _LOGGER = logging.getLogger(__name__)
 # Custom presets for Yandex Smart Home compatibility
 PRESET_AUTO = "auto"
 
+# Fan modes indexed by device speed value
+_FAN_MODES_BY_INDEX = ("Off", "S1", "S2", "S3", "S4", "S5", "S6", "S7")
+
+# Preset -> device mode value
+_PRESET_TO_NUM = {
+    PRESET_COMFORT: "1",  # Ручной режим
+    PRESET_AUTO: "2",     # Авто по CO2
+    PRESET_SLEEP: "3",    # Ночной режим
+    PRESET_BOOST: "4",    # Турбо режим
+    PRESET_ECO: "5",      # Эко режим
+}
+
+# Device mode value -> (HVAC mode, preset)
+_MODE_ROW: dict[int, tuple[HVACMode, str]] = {
+    0: (HVACMode.OFF, PRESET_NONE),
+    1: (HVACMode.FAN_ONLY, PRESET_COMFORT),
+    2: (HVACMode.FAN_ONLY, PRESET_AUTO),
+    3: (HVACMode.FAN_ONLY, PRESET_SLEEP),
+    4: (HVACMode.FAN_ONLY, PRESET_BOOST),
+    5: (HVACMode.FAN_ONLY, PRESET_ECO),
+}
+_MODE_ROW_DEFAULT = (HVACMode.FAN_ONLY, PRESET_NONE)
+
+# Received state bits
+_M_MODE = 1
+_M_SPEED = 2
+_M_TEMP = 4
+_M_CUR_TEMP = 8
+_M_ALL = _M_MODE | _M_SPEED | _M_TEMP | _M_CUR_TEMP
+
+# Delay for coalescing bursts of MQTT state updates into one state write
+_WRITE_DEBOUNCE = 0.03
+
+@lru_cache(maxsize=64)
+def _parse_temp(payload: str) -> int | float:
+    """Parse a temperature payload, trying the integer form first."""
+    try:
+        return int(payload)
+    except ValueError:
+        return float(payload)
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
@@ -49,6 +92,30 @@ async def async_setup_entry(
 class BalluASP100Breezer(ClimateEntity):
     """Representation of a Ballu ASP-100 Breezer device."""
 
+    __slots__ = (
+        "_entry_data",
+        "_device_mac",
+        "_topic_prefix",
+        "_mqtt_client",
+        "_publish",
+        "_topic_mode",
+        "_topic_speed",
+        "_topic_temp",
+        "_topic_state_mode",
+        "_topic_state_speed",
+        "_topic_state_temp",
+        "_topic_state_current_temp",
+        "_hvac_mode",
+        "_target_temperature",
+        "_current_temperature",
+        "_fan_index",
+        "_preset_mode",
+        "_current_mode",
+        "_state_mask",
+        "_fully_synced",
+        "_write_handle",
+    )
+
     _attr_has_entity_name = True
     _attr_name = "Бризер"  # Изменили на русское название для Алисы
     
@@ -75,7 +142,7 @@ class BalluASP100Breezer(ClimateEntity):
     ]
     
     # Fan modes - based on the example
-    _attr_fan_modes = ["Off", "S1", "S2", "S3", "S4", "S5", "S6", "S7"]
+    _attr_fan_modes = list(_FAN_MODES_BY_INDEX)
     
     # Temperature settings
     _attr_min_temp = 5
@@ -89,6 +156,16 @@ class BalluASP100Breezer(ClimateEntity):
         self._device_mac = device_mac
         self._topic_prefix = topic_prefix
         self._mqtt_client = entry_data["mqtt_client"]
+        self._publish = self._mqtt_client.publish
+        
+        # Control and state topics
+        self._topic_mode = f"{topic_prefix}/control/mode"
+        self._topic_speed = f"{topic_prefix}/control/speed"
+        self._topic_temp = f"{topic_prefix}/control/temperature"
+        self._topic_state_mode = f"{topic_prefix}/state/mode"
+        self._topic_state_speed = f"{topic_prefix}/state/speed"
+        self._topic_state_temp = f"{topic_prefix}/state/temperature"
+        self._topic_state_current_temp = f"{topic_prefix}/state/sensor/temperature"
         self._attr_unique_id = f"ballu_asp100_{device_mac}_breezer"
         self._attr_device_info = {
             "identifiers": {(DOMAIN, device_mac)},
@@ -101,25 +178,43 @@ class BalluASP100Breezer(ClimateEntity):
         self._hvac_mode = HVACMode.OFF
         self._target_temperature = 20
         self._current_temperature = None
-        self._fan_mode = None  # Start as None to indicate unknown state
+        self._fan_index = None  # Start as None to indicate unknown state
         self._preset_mode = PRESET_NONE
         self._current_mode = 0  # 0=Off, 1=Manual, 2=Auto CO2, 3=Night, 4=Turbo, 5=Eco
-        self._current_speed = None  # Start as None
         
         # Track if we've received initial state
-        self._state_received = {
-            "mode": False,
-            "speed": False,
-            "temperature": False,
-            "current_temp": False
-        }
+        self._state_mask = 0
+        self._fully_synced = False
+        
+        # Pending coalesced state write
+        self._write_handle: asyncio.TimerHandle | None = None
 
     async def async_added_to_hass(self) -> None:
         """Subscribe to MQTT topics when entity is added to HA."""
         await self._subscribe_topics()
         
-        # Request current state from device
-        await self._request_current_state()
+        # Request current state from device off the setup path
+        self.hass.async_create_task(self._request_current_state())
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Cancel a pending state write when entity is removed."""
+        if self._write_handle is not None:
+            self._write_handle.cancel()
+            self._write_handle = None
+
+    @callback
+    def _schedule_write(self) -> None:
+        """Schedule a state write, coalescing bursts of updates."""
+        if self._write_handle is None or self._write_handle.cancelled():
+            self._write_handle = self.hass.loop.call_later(
+                _WRITE_DEBOUNCE, self._flush_write
+            )
+
+    @callback
+    def _flush_write(self) -> None:
+        """Write the coalesced state to HA."""
+        self._write_handle = None
+        self.async_write_ha_state()
 
     async def _request_current_state(self):
         """Request current state from the device by publishing to command topics."""
@@ -127,225 +222,228 @@ class BalluASP100Breezer(ClimateEntity):
         
         # Publish empty messages to trigger state updates
         topics_to_trigger = [
-            f"{self._topic_prefix}/control/mode",
-            f"{self._topic_prefix}/control/speed", 
-            f"{self._topic_prefix}/control/temperature",
+            self._topic_mode,
+            self._topic_speed,
+            self._topic_temp,
         ]
         
-        for topic in topics_to_trigger:
-            try:
-                await self._mqtt_client.publish(topic, "")
+        try:
+            results = await asyncio.gather(
+                *(self._publish(topic, "") for topic in topics_to_trigger),
+                return_exceptions=True,
+            )
+        except asyncio.CancelledError:
+            _LOGGER.debug("State request cancelled")
+            raise
+        
+        for topic, result in zip(topics_to_trigger, results):
+            if isinstance(result, Exception):
+                _LOGGER.error("Error triggering state request for %s: %s", topic, result)
+            elif result is not True:
+                _LOGGER.error("Failed to trigger state request for: %s", topic)
+            else:
                 _LOGGER.debug("Triggered state request for: %s", topic)
-            except Exception as e:
-                _LOGGER.error("Error triggering state request for %s: %s", topic, e)
 
     async def _subscribe_topics(self) -> None:
         """Subscribe to MQTT topics."""
         
         topics = {
-            "mode": f"{self._topic_prefix}/state/mode",
-            "speed": f"{self._topic_prefix}/state/speed", 
-            "temperature": f"{self._topic_prefix}/state/temperature",
-            "current_temp": f"{self._topic_prefix}/state/sensor/temperature",
+            "mode": self._topic_state_mode,
+            "speed": self._topic_state_speed,
+            "temperature": self._topic_state_temp,
+            "current_temp": self._topic_state_current_temp,
+        }
+
+        # Exact topic -> (update handler, state bit)
+        handlers = {
+            topics["mode"]: (self._update_mode_from_payload, _M_MODE),
+            topics["speed"]: (self._update_fan_from_payload, _M_SPEED),
+            topics["temperature"]: (self._update_temperature_from_payload, _M_TEMP),
+            topics["current_temp"]: (self._update_current_temp_from_payload, _M_CUR_TEMP),
         }
+        schedule_write = self._schedule_write
 
         @callback
         def message_received(topic: str, payload: str):
             """Handle incoming MQTT messages."""
+            # State request echoes carry no payload
+            if not payload:
+                return
+            
             try:
-                _LOGGER.debug("Received MQTT message: %s = %s", topic, payload)
+                if _LOGGER.isEnabledFor(logging.DEBUG):
+                    _LOGGER.debug("Received MQTT message: %s = %s", topic, payload)
+                
+                handler = handlers.get(topic)
+                if handler is None:
+                    return
                 
-                if "mode" in topic:
-                    self._state_received["mode"] = True
-                    self._update_mode_from_payload(payload)
-                elif "speed" in topic:
-                    self._state_received["speed"] = True
-                    self._update_fan_from_payload(payload)
-                elif "temperature" in topic and "sensor" not in topic:
-                    self._state_received["temperature"] = True
-                    self._update_temperature_from_payload(payload)
-                elif "sensor/temperature" in topic:
-                    self._state_received["current_temp"] = True
-                    self._update_current_temp_from_payload(payload)
+                update, state_bit = handler
+                changed = update(payload)
                     
-                # Log state synchronization status
-                if all(self._state_received.values()):
-                    _LOGGER.debug("All state synchronized: mode=%s, speed=%s, temp=%s, current_temp=%s", self._current_mode, self._fan_mode, self._target_temperature, self._current_temperature)
+                # Log state synchronization status once
+                if not self._fully_synced:
+                    self._state_mask |= state_bit
+                    if self._state_mask == _M_ALL:
+                        self._fully_synced = True
+                        if _LOGGER.isEnabledFor(logging.DEBUG):
+                            _LOGGER.debug("All state synchronized: mode=%s, speed=%s, temp=%s, current_temp=%s", self._current_mode, self.fan_mode, self._target_temperature, self._current_temperature)
                 
-                self.async_write_ha_state()
+                # Skip state writes for retained replays and duplicate echoes
+                if changed:
+                    schedule_write()
                 
-            except Exception as e:
+            except (ValueError, TypeError) as e:
                 _LOGGER.error("Error processing MQTT message: %s", e)
 
-        for topic_attr, topic in topics.items():
-            self._mqtt_client.subscribe(topic, message_received)
-            _LOGGER.debug("Subscribed to: %s", topic)
+        self._mqtt_client.subscribe_many(
+            [(topic, message_received) for topic in topics.values()]
+        )
+        _LOGGER.debug("Subscribed to %d topics", len(topics))
 
-    def _update_mode_from_payload(self, payload: str) -> None:
-        """Update mode from payload."""
+    def _update_mode_from_payload(self, payload: str) -> bool:
+        """Update mode from payload, return True if the state changed."""
         try:
             mode_value = int(payload)
-            self._current_mode = mode_value
-            
-            # Update HVAC mode
-            if mode_value == 0:
-                self._hvac_mode = HVACMode.OFF
-            else:
-                self._hvac_mode = HVACMode.FAN_ONLY
-            
-            # Update preset mode for Yandex compatibility
-            if mode_value == 1:
-                self._preset_mode = PRESET_COMFORT  # "comfort"
-            elif mode_value == 2:
-                self._preset_mode = PRESET_AUTO     # "auto" 
-            elif mode_value == 3:
-                self._preset_mode = PRESET_SLEEP    # "sleep"
-            elif mode_value == 4:
-                self._preset_mode = PRESET_BOOST    # "boost"
-            elif mode_value == 5:
-                self._preset_mode = PRESET_ECO      # "eco"
-            else:
-                self._preset_mode = PRESET_NONE     # "none"
+            previous = (self._current_mode, self._hvac_mode, self._preset_mode)
+            self._set_mode(mode_value)
                 
-            _LOGGER.debug("Updated mode: value=%s, hvac=%s, preset=%s", mode_value, self._hvac_mode, self._preset_mode)
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.debug("Updated mode: value=%s, hvac=%s, preset=%s", mode_value, self._hvac_mode, self._preset_mode)
+            
+            return (self._current_mode, self._hvac_mode, self._preset_mode) != previous
                         
         except ValueError:
             _LOGGER.error("Invalid mode payload: %s", payload)
+            return False
+
+    def _set_mode(self, mode_value: int) -> None:
+        """Set device mode along with the matching HVAC mode and preset."""
+        self._current_mode = mode_value
+        self._hvac_mode, self._preset_mode = _MODE_ROW.get(mode_value, _MODE_ROW_DEFAULT)
 
-    def _update_fan_from_payload(self, payload: str) -> None:
-        """Update fan mode from payload."""
+    def _update_fan_from_payload(self, payload: str) -> bool:
+        """Update fan mode from payload, return True if the state changed."""
+        previous = self._fan_index
+        
+        # Handle both integer and string payloads
         try:
-            speed_mapping = {
-                "0": "Off",
-                "1": "S1", 
-                "2": "S2",
-                "3": "S3",
-                "4": "S4",
-                "5": "S5",
-                "6": "S6",
-                "7": "S7",
-            }
-            
-            # Handle both string and integer payloads
-            if payload.isdigit():
-                self._fan_mode = speed_mapping.get(payload, "Off")
-                self._current_speed = payload
-            else:
-                # If payload is already a string like "S2", use it directly
-                self._fan_mode = payload if payload in self._attr_fan_modes else "Off"
-                self._current_speed = self._fan_mode.replace("S", "") if self._fan_mode.startswith("S") else "0"
-            
-            _LOGGER.debug("Updated fan mode: %s (raw: %s)", self._fan_mode, payload)
-            
-        except Exception as e:
-            _LOGGER.error("Error updating fan mode from payload '%s': %s", payload, e)
-            self._fan_mode = "Off"
-            self._current_speed = "0"
+            index = int(payload)
+        except ValueError:
+            # If payload is already a string like "S2", map it back to its index
+            index = _FAN_MODES_BY_INDEX.index(payload) if payload in _FAN_MODES_BY_INDEX else 0
+        else:
+            if not 0 <= index < len(_FAN_MODES_BY_INDEX):
+                index = 0
+        
+        self._fan_index = index
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug("Updated fan mode: %s (raw: %s)", _FAN_MODES_BY_INDEX[index], payload)
+        
+        return index != previous
 
-    def _update_temperature_from_payload(self, payload: str) -> None:
-        """Update target temperature from payload."""
+    def _update_temperature_from_payload(self, payload: str) -> bool:
+        """Update target temperature from payload, return True if it changed."""
         try:
-            self._target_temperature = float(payload)
-            _LOGGER.debug("Updated target temperature: %s", self._target_temperature)
+            temperature = _parse_temp(payload)
         except ValueError:
             _LOGGER.error("Invalid temperature payload: %s", payload)
+            return False
+        
+        if not self.min_temp <= temperature <= self.max_temp:
+            _LOGGER.warning("Target temperature out of range: %s", payload)
+            return False
+        
+        if temperature == self._target_temperature:
+            return False
+        self._target_temperature = temperature
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug("Updated target temperature: %s", self._target_temperature)
+        return True
 
-    def _update_current_temp_from_payload(self, payload: str) -> None:
-        """Update current temperature from payload."""
+    def _update_current_temp_from_payload(self, payload: str) -> bool:
+        """Update current temperature from payload, return True if it changed."""
         try:
-            self._current_temperature = float(payload)
-            _LOGGER.debug("Updated current temperature: %s", self._current_temperature)
+            temperature = _parse_temp(payload)
         except ValueError:
             _LOGGER.error("Invalid current temperature payload: %s", payload)
+            return False
+        
+        if temperature == self._current_temperature:
+            return False
+        self._current_temperature = temperature
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug("Updated current temperature: %s", self._current_temperature)
+        return True
 
     # Control methods
     async def async_set_temperature(self, **kwargs: Any) -> None:
         """Set new target temperature."""
         if temperature := kwargs.get(ATTR_TEMPERATURE):
-            await self._mqtt_client.publish(
-                f"{self._topic_prefix}/control/temperature",
+            # Defaults are placeholders until the breezer reports its state
+            if self._state_mask & _M_TEMP and temperature == self._target_temperature:
+                return
+            if not await self._publish(
+                self._topic_temp,
                 str(int(temperature)),
-            )
+            ):
+                return
             self._target_temperature = temperature
             self.async_write_ha_state()
 
     async def async_set_hvac_mode(self, hvac_mode: HVACMode) -> None:
         """Set new HVAC mode."""
+        if self._state_mask & _M_MODE and hvac_mode == self._hvac_mode:
+            return
+        
         if hvac_mode == HVACMode.OFF:
-            await self._mqtt_client.publish(
-                f"{self._topic_prefix}/control/mode",
+            if not await self._publish(
+                self._topic_mode,
                 "0",  # Turn off
-            )
-            self._hvac_mode = HVACMode.OFF
-            self._current_mode = 0
-            self._preset_mode = PRESET_NONE
+            ):
+                return
+            self._set_mode(0)
         else:  # FAN_ONLY
             # Turn on with last used mode, or default to comfort mode
             mode_to_set = self._current_mode if self._current_mode > 0 else 1
-            await self._mqtt_client.publish(
-                f"{self._topic_prefix}/control/mode",
+            if not await self._publish(
+                self._topic_mode,
                 str(mode_to_set),
-            )
-            self._hvac_mode = HVACMode.FAN_ONLY
-            self._current_mode = mode_to_set
-            
-            # Update preset based on mode
-            if mode_to_set == 1:
-                self._preset_mode = PRESET_COMFORT
-            elif mode_to_set == 2:
-                self._preset_mode = PRESET_AUTO
-            elif mode_to_set == 3:
-                self._preset_mode = PRESET_SLEEP
-            elif mode_to_set == 4:
-                self._preset_mode = PRESET_BOOST
-            elif mode_to_set == 5:
-                self._preset_mode = PRESET_ECO
+            ):
+                return
+            self._set_mode(mode_to_set)
         
         self.async_write_ha_state()
 
     async def async_set_fan_mode(self, fan_mode: str) -> None:
         """Set new fan mode."""
-        speed_mapping = {
-            "Off": "0",
-            "S1": "1",
-            "S2": "2", 
-            "S3": "3",
-            "S4": "4",
-            "S5": "5",
-            "S6": "6",
-            "S7": "7",
-        }
-        speed_value = speed_mapping.get(fan_mode, "0")
+        index = _FAN_MODES_BY_INDEX.index(fan_mode) if fan_mode in _FAN_MODES_BY_INDEX else 0
+        if index == self._fan_index:
+            return
         
-        await self._mqtt_client.publish(
-            f"{self._topic_prefix}/control/speed",
-            speed_value,
-        )
+        if not await self._publish(
+            self._topic_speed,
+            str(index),
+        ):
+            return
         
-        self._fan_mode = fan_mode
-        self._current_speed = speed_value
+        self._fan_index = index
         self.async_write_ha_state()
 
     async def async_set_preset_mode(self, preset_mode: str) -> None:
         """Set new preset mode."""
-        preset_mapping = {
-            PRESET_COMFORT: "1",  # Ручной режим
-            PRESET_AUTO: "2",     # Авто по CO2
-            PRESET_SLEEP: "3",    # Ночной режим
-            PRESET_BOOST: "4",    # Турбо режим
-            PRESET_ECO: "5",      # Эко режим
-        }
-        
-        mode_value = preset_mapping.get(preset_mode, "1")
+        mode_value = _PRESET_TO_NUM.get(preset_mode, "1")
+        # Compare device modes: "none" maps to mode 1 but is shown for modes 6+
+        if self._state_mask & _M_MODE and int(mode_value) == self._current_mode:
+            return
         
-        await self._mqtt_client.publish(
-            f"{self._topic_prefix}/control/mode",
+        if not await self._publish(
+            self._topic_mode,
             mode_value,
-        )
+        ):
+            return
         
-        self._preset_mode = preset_mode
-        self._hvac_mode = HVACMode.FAN_ONLY
-        self._current_mode = int(mode_value)
+        self._set_mode(int(mode_value))
         self.async_write_ha_state()
 
     @property
@@ -356,9 +454,9 @@ class BalluASP100Breezer(ClimateEntity):
     @property
     def fan_mode(self) -> str | None:
         """Return the fan setting."""
-        if self._fan_mode is None:
+        if self._fan_index is None:
             return "Off"
-        return self._fan_mode
+        return _FAN_MODES_BY_INDEX[self._fan_index]
 
     @property
     def preset_mode(self) -> str | None:
@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import logging
+import re
 import voluptuous as vol
 from typing import Any
 
@@ -17,6 +18,18 @@ from .const import (
 
 _LOGGER = logging.getLogger(__name__)
 
+_MAC_RE = re.compile(r"^[0-9a-f]{12}$")
+_CID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+_USER_STEP_SCHEMA = vol.Schema({
+    vol.Required(CONF_DEVICE_MAC, default="a0dd6c0b3cd8"): str,
+    vol.Required(CONF_CLIENT_ID, default="bb2791f30a28776d6fe45943f1b68928"): str,
+    vol.Required(CONF_BROKER_HOST, default=DEFAULT_BROKER_HOST): str,
+    vol.Required(CONF_BROKER_PORT, default=DEFAULT_BROKER_PORT): int,
+    vol.Required(CONF_USERNAME, default=DEFAULT_USERNAME): str,
+    vol.Required(CONF_PASSWORD, default=DEFAULT_PASSWORD): str,
+})
+
 class BalluConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Ballu ASP-100."""
 
@@ -30,38 +43,39 @@ class BalluConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         
         if user_input is not None:
             # Validate input
-            if not user_input[CONF_DEVICE_MAC].strip():
+            device_mac = user_input[CONF_DEVICE_MAC].strip().lower().replace(":", "")
+            client_id = user_input[CONF_CLIENT_ID].strip().lower()
+            if not device_mac:
                 errors[CONF_DEVICE_MAC] = "device_mac_required"
-            elif not user_input[CONF_CLIENT_ID].strip():
+            elif not _MAC_RE.match(device_mac):
+                errors[CONF_DEVICE_MAC] = "invalid_mac"
+            elif not client_id:
                 errors[CONF_CLIENT_ID] = "client_id_required"
+            elif not _CID_RE.match(client_id):
+                errors[CONF_CLIENT_ID] = "invalid_client_id"
             else:
                 # Create unique ID and check if already configured
-                unique_id = f"ballu_asp100_{user_input[CONF_DEVICE_MAC].lower().replace(':', '')}"
+                unique_id = f"ballu_asp100_{device_mac}"
                 
                 await self.async_set_unique_id(unique_id)
                 self._abort_if_unique_id_configured()
                 
                 _LOGGER.debug("Creating Ballu ASP-100 entry with unique_id: %s", unique_id)
                 
-                # Create the config entry
+                # Create the config entry with the normalized identifiers
                 return self.async_create_entry(
-                    title=f"Бризер ({user_input[CONF_DEVICE_MAC]})",
-                    data=user_input,
+                    title=f"Бризер ({device_mac})",
+                    data={
+                        **user_input,
+                        CONF_DEVICE_MAC: device_mac,
+                        CONF_CLIENT_ID: client_id,
+                    },
                 )
 
         # Show the form with pre-filled values
-        data_schema = vol.Schema({
-            vol.Required(CONF_DEVICE_MAC, default="a0dd6c0b3cd8"): str,
-            vol.Required(CONF_CLIENT_ID, default="bb2791f30a28776d6fe45943f1b68928"): str,
-            vol.Required(CONF_BROKER_HOST, default=DEFAULT_BROKER_HOST): str,
-            vol.Required(CONF_BROKER_PORT, default=DEFAULT_BROKER_PORT): int,
-            vol.Required(CONF_USERNAME, default=DEFAULT_USERNAME): str,
-            vol.Required(CONF_PASSWORD, default=DEFAULT_PASSWORD): str,
-        })
-
         return self.async_show_form(
             step_id="user",
-            data_schema=data_schema,
+            data_schema=_USER_STEP_SCHEMA,
             errors=errors,
             description_placeholders={
                 "entity_id": "climate.ballu_oneair_asp_100_breezer"
@@ -81,6 +95,9 @@ class BalluOptionsFlowHandler(config_entries.OptionsFlow):
     def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
         """Initialize options flow."""
         self.config_entry = config_entry
+        # Last options schema and the defaults it was built from
+        self._schema_defaults: tuple | None = None
+        self._schema: vol.Schema | None = None
 
     async def async_step_init(
         self, user_input: dict[str, Any] | None = None
@@ -103,12 +120,24 @@ class BalluOptionsFlowHandler(config_entries.OptionsFlow):
             return self.async_create_entry(title="", data={})
 
         # Pre-fill form with current values
-        data_schema = vol.Schema({
-            vol.Required(CONF_BROKER_HOST, default=self.config_entry.data.get(CONF_BROKER_HOST, DEFAULT_BROKER_HOST)): str,
-            vol.Required(CONF_BROKER_PORT, default=self.config_entry.data.get(CONF_BROKER_PORT, DEFAULT_BROKER_PORT)): int,
-            vol.Required(CONF_USERNAME, default=self.config_entry.data.get(CONF_USERNAME, DEFAULT_USERNAME)): str,
-            vol.Required(CONF_PASSWORD, default=self.config_entry.data.get(CONF_PASSWORD, DEFAULT_PASSWORD)): str,
-        })
+        data = self.config_entry.data
+        defaults = (
+            data.get(CONF_BROKER_HOST, DEFAULT_BROKER_HOST),
+            data.get(CONF_BROKER_PORT, DEFAULT_BROKER_PORT),
+            data.get(CONF_USERNAME, DEFAULT_USERNAME),
+            data.get(CONF_PASSWORD, DEFAULT_PASSWORD),
+        )
+        data_schema = self._schema
+        if data_schema is None or defaults != self._schema_defaults:
+            host, port, username, password = defaults
+            data_schema = vol.Schema({
+                vol.Required(CONF_BROKER_HOST, default=host): str,
+                vol.Required(CONF_BROKER_PORT, default=port): int,
+                vol.Required(CONF_USERNAME, default=username): str,
+                vol.Required(CONF_PASSWORD, default=password): str,
+            })
+            self._schema_defaults = defaults
+            self._schema = data_schema
 
         return self.async_show_form(
             step_id="user",
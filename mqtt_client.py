@@ -4,11 +4,55 @@ from __future__ import annotations
 import logging
 import asyncio
 import ssl
+import threading
+from functools import lru_cache
+from operator import itemgetter
 from typing import Callable, Any
 import paho.mqtt.client as mqtt
 
 _LOGGER = logging.getLogger(__name__)
 
+# Reconnect backoff bounds in seconds, as used by paho's network thread
+_RECONNECT_DELAY_MIN = 1
+_RECONNECT_DELAY_MAX = 120
+
+# Shared TLS context, created on first use
+_SSL_CTX: ssl.SSLContext | None = None
+_SSL_CTX_LOCK = threading.Lock()
+
+def _get_ssl_context() -> ssl.SSLContext:
+    """Return the shared TLS context, creating it on first call."""
+    global _SSL_CTX
+    with _SSL_CTX_LOCK:
+        if _SSL_CTX is None:
+            context = ssl.create_default_context()
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+            _SSL_CTX = context
+        return _SSL_CTX
+
+@lru_cache(maxsize=1024)
+def _split_topic(topic: str) -> tuple[str, ...]:
+    """Split topic into its levels."""
+    return tuple(topic.split('/'))
+
+def _compile_pattern(pattern: tuple[str, ...]) -> Callable[[tuple[str, ...]], bool]:
+    """Build a matcher comparing only the fixed levels of a wildcard filter.
+    
+    The matcher expects topic parts with at least as many levels as pattern.
+    """
+    indices = [i for i, part in enumerate(pattern) if part != '+']
+    if not indices:
+        return lambda parts: True
+    
+    getter = itemgetter(*indices)
+    if len(indices) == 1:
+        token = pattern[indices[0]]
+        return lambda parts: getter(parts) == token
+    
+    tokens = tuple(pattern[i] for i in indices)
+    return lambda parts: getter(parts) == tokens
+
 class BalluMQTTClient:
     """MQTT client for Ballu ASP-100."""
     
@@ -16,20 +60,33 @@ class BalluMQTTClient:
         """Initialize MQTT client."""
         self.hass = hass
         self.config = config
+        self._host = config.get("broker_host")
+        self._port = config.get("broker_port")
+        self._user = config.get("username")
+        self._password = config.get("password")
         self.client = None
         self.connected = False
         self.subscriptions = {}
-        self._message_queue = asyncio.Queue()
-        self._message_processor_task = None
+        # Exact topic -> callback
+        self._exact = {}
+        # Level count -> (pattern parts, matcher, callback) for '+' wildcard filters
+        self._wild_by_len = {}
+        # (pattern parts without the trailing '#', matcher, callback) for '#' filters
+        self._wild_hash = []
+        # Matched callbacks per incoming topic, including topics with no match
+        self._cached_callbacks = lru_cache(maxsize=4096)(self._match_callbacks)
+        self._call_soon_threadsafe = hass.loop.call_soon_threadsafe
+        self._connected_event = asyncio.Event()
+        self._misc_timer = None
+        self._reconnect_task = None
+        self._reconnect_delay = _RECONNECT_DELAY_MIN
+        self._stopping = False
         
     async def connect(self):
         """Connect to MQTT broker."""
         try:
             self.client = mqtt.Client()
-            self.client.username_pw_set(
-                self.config.get("username"), 
-                self.config.get("password")
-            )
+            self.client.username_pw_set(self._user, self._password)
             
             # Setup TLS in executor to avoid blocking
             await self._setup_tls()
@@ -39,33 +96,36 @@ class BalluMQTTClient:
             self.client.on_message = self._on_message
             self.client.on_disconnect = self._on_disconnect
             
+            # Drive paho from the event loop instead of a network thread
+            self.client.on_socket_open = self._on_socket_open
+            self.client.on_socket_close = self._on_socket_close
+            self.client.on_socket_register_write = self._on_socket_register_write
+            self.client.on_socket_unregister_write = self._on_socket_unregister_write
+            
             # Connect
-            host = self.config.get("broker_host")
-            port = self.config.get("broker_port")
+            host = self._host
+            port = self._port
             
             _LOGGER.debug("Connecting to MQTT broker: %s:%s", host, port)
             
             # Connect in executor
             def _connect():
                 self.client.connect(host, port, 60)
-                self.client.loop_start()
             
+            self._stopping = False
+            self._connected_event.clear()
             await self.hass.async_add_executor_job(_connect)
             
-            # Start message processor
-            self._message_processor_task = asyncio.create_task(
-                self._process_messages()
-            )
-            
             # Wait for connection
-            for _ in range(10):
-                if self.connected:
-                    _LOGGER.debug("Successfully connected to MQTT broker")
-                    return True
-                await asyncio.sleep(0.5)
+            try:
+                await asyncio.wait_for(self._connected_event.wait(), timeout=5)
+            except asyncio.TimeoutError:
+                _LOGGER.error("Timeout connecting to MQTT broker")
+                await self.disconnect()
+                return False
             
-            _LOGGER.error("Timeout connecting to MQTT broker")
-            return False
+            _LOGGER.debug("Successfully connected to MQTT broker")
+            return True
             
         except Exception as e:
             _LOGGER.error("Error connecting to MQTT broker: %s", e)
@@ -74,13 +134,8 @@ class BalluMQTTClient:
     async def _setup_tls(self):
         """Setup TLS in executor to avoid blocking event loop."""
         def _setup_tls_sync():
-            # Create SSL context
-            context = ssl.create_default_context()
-            context.check_hostname = False
-            context.verify_mode = ssl.CERT_NONE
-            
-            # Configure TLS
-            self.client.tls_set_context(context)
+            # Configure TLS with the shared context
+            self.client.tls_set_context(_get_ssl_context())
             self.client.tls_insecure_set(True)
         
         await self.hass.async_add_executor_job(_setup_tls_sync)
@@ -88,124 +143,223 @@ class BalluMQTTClient:
     
     async def disconnect(self):
         """Disconnect from MQTT broker."""
-        if self._message_processor_task:
-            self._message_processor_task.cancel()
-            try:
-                await self._message_processor_task
-            except asyncio.CancelledError:
-                pass
+        self._stopping = True
+        if self._reconnect_task:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
         
         if self.client:
-            def _disconnect():
-                self.client.loop_stop()
-                self.client.disconnect()
-            
-            await self.hass.async_add_executor_job(_disconnect)
+            self.client.disconnect()
+            if self._misc_timer is not None:
+                self._misc_timer.cancel()
+                self._misc_timer = None
             self.connected = False
     
     def _on_connect(self, client, userdata, flags, rc):
         """Handle MQTT connection."""
+        if self._stopping:
+            # A reconnect finished after disconnect() was called
+            client.disconnect()
+            return
+        
         if rc == 0:
             self.connected = True
+            self._reconnect_delay = _RECONNECT_DELAY_MIN
+            self._connected_event.set()
             _LOGGER.debug("MQTT connected successfully")
             
-            # Resubscribe to topics
-            for topic, callback in self.subscriptions.items():
-                client.subscribe(topic)
-                _LOGGER.debug("Resubscribed to: %s", topic)
+            # Resubscribe to topics with a single SUBSCRIBE packet
+            if self.subscriptions:
+                client.subscribe([(topic, 0) for topic in self.subscriptions])
+                _LOGGER.debug("Resubscribed to: %s", ", ".join(self.subscriptions))
         else:
             _LOGGER.error("MQTT connection failed with code: %s", rc)
             self.connected = False
     
     def _on_message(self, client, userdata, msg):
-        """Handle MQTT messages - put them in queue for async processing."""
+        """Handle MQTT messages in the event loop."""
         topic = msg.topic
-        payload = msg.payload.decode()
+        callbacks = self._cached_callbacks(topic)
+        if not callbacks:
+            return
         
-        _LOGGER.debug("Queueing MQTT message: %s = %s", topic, payload)
+        # Decode only messages somebody subscribed to
+        payload = msg.payload.decode()
         
-        # Put message in queue for async processing
-        try:
-            self._message_queue.put_nowait((topic, payload))
-        except asyncio.QueueFull:
-            _LOGGER.warning("Message queue full, dropping message: %s", topic)
-    
-    async def _process_messages(self):
-        """Process MQTT messages in async context."""
-        while True:
+        for callback in callbacks:
             try:
-                topic, payload = await self._message_queue.get()
-                _LOGGER.debug("Processing MQTT message: %s = %s", topic, payload)
-                
-                # Call registered callbacks
-                for sub_topic, callback in self.subscriptions.items():
-                    if self._topic_matches(sub_topic, topic):
-                        # Schedule callback in event loop
-                        self.hass.loop.call_soon_threadsafe(
-                            lambda: callback(topic, payload)
-                        )
-                
-                self._message_queue.task_done()
-                
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                _LOGGER.error("Error processing MQTT message: %s", e)
+                callback(topic, payload)
+            except Exception:
+                _LOGGER.exception("Error processing MQTT message on %s", topic)
     
     def _on_disconnect(self, client, userdata, rc):
         """Handle MQTT disconnection."""
         self.connected = False
         _LOGGER.debug("MQTT disconnected")
+        
+        # Paho no longer runs its own reconnecting network thread
+        if rc != 0 and not self._stopping and (
+            self._reconnect_task is None or self._reconnect_task.done()
+        ):
+            self._reconnect_task = self.hass.async_create_task(self._reconnect())
+    
+    async def _reconnect(self):
+        """Reconnect to MQTT broker after an unexpected disconnect."""
+        while not self.connected and not self._stopping:
+            delay = self._reconnect_delay
+            # Back off until the broker accepts the connection in _on_connect
+            self._reconnect_delay = min(delay * 2, _RECONNECT_DELAY_MAX)
+            await asyncio.sleep(delay)
+            try:
+                await self.hass.async_add_executor_job(self.client.reconnect)
+                return
+            except OSError as e:
+                _LOGGER.debug("Reconnecting to MQTT broker failed: %s", e)
+    
+    def _run_in_loop(self, func: Callable, *args: Any):
+        """Run func in the event loop, directly if already running in it."""
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        
+        if running_loop is self.hass.loop:
+            func(*args)
+        else:
+            self._call_soon_threadsafe(func, *args)
+    
+    def _on_socket_open(self, client, userdata, sock):
+        """Start watching a newly opened socket from the event loop."""
+        self._run_in_loop(self._async_on_socket_open, sock.fileno(), sock)
+    
+    def _on_socket_close(self, client, userdata, sock):
+        """Stop watching a socket that is about to be closed."""
+        self._run_in_loop(self._async_on_socket_close, sock.fileno())
+    
+    def _on_socket_register_write(self, client, userdata, sock):
+        """Watch socket for writability while paho has data queued."""
+        self._run_in_loop(self.hass.loop.add_writer, sock.fileno(), self._on_socket_writable)
+    
+    def _on_socket_unregister_write(self, client, userdata, sock):
+        """Stop watching socket for writability."""
+        self._run_in_loop(self.hass.loop.remove_writer, sock.fileno())
+    
+    def _async_on_socket_open(self, fileno: int, sock):
+        """Add socket reader and start the misc loop."""
+        if self._stopping:
+            # client.reconnect() cannot be cancelled once it runs in the executor
+            self.client.disconnect()
+            return
+        
+        self.hass.loop.add_reader(fileno, self._on_socket_readable, sock)
+        if self._misc_timer is None:
+            self._misc_timer = self.hass.loop.call_later(1, self._misc_loop)
+    
+    def _async_on_socket_close(self, fileno: int):
+        """Remove socket reader and writer and stop the misc loop."""
+        self.hass.loop.remove_reader(fileno)
+        self.hass.loop.remove_writer(fileno)
+        if self._misc_timer is not None:
+            self._misc_timer.cancel()
+            self._misc_timer = None
+    
+    def _on_socket_readable(self, sock):
+        """Read incoming MQTT packets."""
+        rc = self.client.loop_read()
+        # TLS may hold decrypted data without the socket becoming readable again
+        while (
+            rc == mqtt.MQTT_ERR_SUCCESS
+            and isinstance(sock, ssl.SSLSocket)
+            and sock.fileno() != -1
+            and sock.pending()
+        ):
+            rc = self.client.loop_read()
+    
+    def _on_socket_writable(self):
+        """Write queued MQTT packets."""
+        self.client.loop_write()
+    
+    def _misc_loop(self):
+        """Handle keepalive and retries once per second."""
+        self.client.loop_misc()
+        # loop_misc closes the socket on keepalive timeout; stay stopped then
+        if self.client.socket() is not None:
+            self._misc_timer = self.hass.loop.call_later(1, self._misc_loop)
+        else:
+            self._misc_timer = None
+    
+    def _add_subscription(self, topic: str, callback: Callable):
+        """Register callback for topic filter."""
+        self.subscriptions[topic] = callback
+        
+        if '+' in topic or '#' in topic:
+            parts = _split_topic(topic)
+            if parts[-1] == '#':
+                parts = parts[:-1]
+                bucket = self._wild_hash
+            else:
+                bucket = self._wild_by_len.setdefault(len(parts), [])
+            bucket[:] = [wild for wild in bucket if wild[0] != parts]
+            bucket.append((parts, _compile_pattern(parts), callback))
+        else:
+            self._exact[topic] = callback
+        
+        self._cached_callbacks.cache_clear()
+    
+    def _match_callbacks(self, topic: str) -> tuple[Callable, ...]:
+        """Return callbacks of all subscriptions matching topic."""
+        matches = []
+        append = matches.append
+        wild_by_len = self._wild_by_len
+        wild_hash = self._wild_hash
+        
+        callback = self._exact.get(topic)
+        if callback is not None:
+            append(callback)
+        
+        if wild_by_len or wild_hash:
+            parts = _split_topic(topic)
+            num_parts = len(parts)
+            # Only '+' filters with the same number of levels can match
+            for _, matcher, callback in wild_by_len.get(num_parts, ()):
+                if matcher(parts):
+                    append(callback)
+            for pattern, matcher, callback in wild_hash:
+                if num_parts >= len(pattern) and matcher(parts):
+                    append(callback)
+        
+        # Call a callback once even if several overlapping filters match
+        return tuple(dict.fromkeys(matches))
     
     def subscribe(self, topic: str, callback: Callable):
         """Subscribe to MQTT topic."""
-        self.subscriptions[topic] = callback
+        self._add_subscription(topic, callback)
         
         if self.connected and self.client:
-            def _subscribe():
-                self.client.subscribe(topic)
-            self.hass.loop.call_soon_threadsafe(
-                lambda: self.hass.async_add_executor_job(_subscribe)
-            )
+            self.client.subscribe(topic)
             _LOGGER.debug("Subscribed to: %s", topic)
     
+    def subscribe_many(self, subscriptions: list[tuple[str, Callable]], qos: int = 0):
+        """Subscribe to several MQTT topics with a single SUBSCRIBE packet."""
+        for topic, callback in subscriptions:
+            self._add_subscription(topic, callback)
+        
+        if self.connected and self.client and subscriptions:
+            topics = [(topic, qos) for topic, _ in subscriptions]
+            self.client.subscribe(topics)
+            _LOGGER.debug("Subscribed to: %s", ", ".join(topic for topic, _ in topics))
+    
     async def publish(self, topic: str, payload: str, qos: int = 0, retain: bool = False):
         """Publish MQTT message."""
         if not self.connected:
             _LOGGER.error("Cannot publish, MQTT not connected")
             return False
         
-        def _publish():
-            self.client.publish(topic, payload, qos, retain)
-        
-        try:
-            await self.hass.async_add_executor_job(_publish)
-            _LOGGER.debug("Published: %s = %s", topic, payload)
-            return True
-        except Exception as e:
-            _LOGGER.error("Error publishing to %s: %s", topic, e)
+        # Non-blocking: paho queues the packet and the event loop writes it
+        info = self.client.publish(topic, payload, qos, retain)
+        if info.rc != mqtt.MQTT_ERR_SUCCESS:
+            _LOGGER.error("Error publishing to %s: %s", topic, mqtt.error_string(info.rc))
             return False
-    
-    def _topic_matches(self, subscription: str, topic: str) -> bool:
-        """Check if topic matches subscription pattern."""
-        if subscription == topic:
-            return True
-        
-        # Simple wildcard matching
-        if '+' in subscription or '#' in subscription:
-            sub_parts = subscription.split('/')
-            topic_parts = topic.split('/')
-            
-            for i, sub_part in enumerate(sub_parts):
-                if i >= len(topic_parts):
-                    return False
-                if sub_part == '+':
-                    continue
-                if sub_part == '#':
-                    return True
-                if sub_part != topic_parts[i]:
-                    return False
-            
-            return len(sub_parts) == len(topic_parts)
         
-        return False
\ No newline at end of file
+        _LOGGER.debug("Published: %s = %s", topic, payload)
+        return True